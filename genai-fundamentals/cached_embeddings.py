@@ -0,0 +1,92 @@
+# =================================================================
+# EMBEDDER COM MEMÓRIA
+# =================================================================
+
+import functools
+
+from neo4j_graphrag.embeddings.openai import OpenAIEmbeddings
+
+# O modelo 'text-embedding-3-small' gera 1536 números por texto, mas aceita
+# o parâmetro 'dimensions' para devolver só os primeiros (a OpenAI treina o
+# modelo para que o início do vetor já carregue a maior parte do significado).
+# Com 512 números, cada vetor ocupa um terço do espaço e a comparação no
+# índice vetorial fica mais barata. O índice 'moviePlots' precisa ter sido
+# recriado com 512 dimensões pelo script 'reindex_embeddings.py'.
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSIONS = 512
+
+# Quantos vetores de perguntas diferentes mantemos na memória.
+EMBEDDING_CACHE_SIZE = 4096
+
+# Limites do /v1/embeddings (estimando 4 caracteres por token): cada texto
+# pode ter no máximo 8191 tokens, e uma requisição aceita até 2048 textos
+# somando no máximo 300 mil tokens.
+EMBEDDING_BATCH_SIZE = 2048
+EMBEDDING_INPUT_TOKENS = 8191
+EMBEDDING_REQUEST_TOKENS = 300_000
+
+
+def _estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+def _batches(texts):
+    batch, tokens = [], 0
+    for text in texts:
+        text_tokens = _estimate_tokens(text)
+        # Um texto grande demais seria recusado pela OpenAI de qualquer jeito;
+        # avisamos antes, dizendo qual é o texto.
+        if text_tokens > EMBEDDING_INPUT_TOKENS:
+            raise ValueError(
+                f"Texto com ~{text_tokens} tokens excede o limite de "
+                f"{EMBEDDING_INPUT_TOKENS} por texto: {text[:50]!r}..."
+            )
+        if batch and (len(batch) == EMBEDDING_BATCH_SIZE or tokens + text_tokens > EMBEDDING_REQUEST_TOKENS):
+            yield batch
+            batch, tokens = [], 0
+        batch.append(text)
+        tokens += text_tokens
+    if batch:
+        yield batch
+
+
+class CachedOpenAIEmbeddings(OpenAIEmbeddings):
+    """OpenAIEmbeddings que lembra o vetor de cada texto já enviado.
+
+    O retriever chama embed_query() a cada .search(), mesmo que só a
+    retrieval_query tenha mudado. Se o texto já foi transformado em vetor,
+    devolvemos o vetor guardado e pulamos a ida até a OpenAI.
+    """
+
+    def __init__(self, model="text-embedding-ada-002", dimensions=None, **kwargs):
+        super().__init__(model=model, **kwargs)
+        self.dimensions = dimensions
+        # Só enviamos 'dimensions' quando ele foi pedido: o modelo ada-002 não o aceita.
+        self._embedding_params = {"dimensions": dimensions} if dimensions else {}
+        self._cached_embedding = functools.lru_cache(maxsize=EMBEDDING_CACHE_SIZE)(
+            self._fetch_embedding
+        )
+
+    def _fetch_embedding(self, model, text):
+        response = self.client.embeddings.create(input=text, model=model, **self._embedding_params)
+        return tuple(response.data[0].embedding)
+
+    def embed_query(self, text, **kwargs):
+        # Parâmetros extras mudam o vetor gerado, então nesse caso não usamos o cache.
+        if kwargs:
+            return super().embed_query(text, **{**self._embedding_params, **kwargs})
+        return list(self._cached_embedding(self.model, text))
+
+    def embed_documents(self, texts):
+        """Gera os vetores de vários textos com o mínimo de chamadas à OpenAI.
+
+        Em vez de uma requisição por texto, os textos são enviados em lotes;
+        a resposta traz um vetor por texto, na mesma ordem da entrada.
+        """
+        embeddings = []
+        for batch in _batches(texts):
+            response = self.client.embeddings.create(
+                input=batch, model=self.model, **self._embedding_params
+            )
+            embeddings.extend(item.embedding for item in response.data)
+        return embeddings
@@ -0,0 +1,97 @@
+# =================================================================
+# DOIS RETRIEVERS, UMA RESPOSTA
+# =================================================================
+
+from concurrent.futures import ThreadPoolExecutor
+
+from neo4j_graphrag.generation.prompts import RagTemplate
+from neo4j_graphrag.generation.types import RagResultModel
+from neo4j_graphrag.types import RetrieverResult
+
+from rag_stream import generate_answer, print_context
+
+# O Text2Cypher é bom em fatos exatos ("em que ano..."), e o Vector em
+# significado ("filmes sobre..."). Juntando os dois, o LLM recebe os dois
+# tipos de contexto. As duas buscas são independentes, então não faz
+# sentido esperar uma terminar para começar a outra: rodamos as duas ao
+# mesmo tempo e o tempo total passa a ser o da mais lenta, não a soma.
+
+
+class CompositeRAG:
+    """Pipeline RAG que combina um Text2CypherRetriever e um VectorCypherRetriever."""
+
+    def __init__(self, t2c_retriever, vector_retriever, llm, prompt_template=RagTemplate()):
+        self.t2c_retriever = t2c_retriever
+        self.vector_retriever = vector_retriever
+        self.llm = llm
+        self.prompt_template = prompt_template
+
+    def _retrieve(self, query_text, retriever_config):
+        # Os retrievers são síncronos; cada um roda em sua própria thread.
+        # (Usamos threads e não asyncio.run para que search() funcione também
+        # dentro de um event loop já rodando, como no Jupyter.)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = {
+                "text2cypher": executor.submit(self.t2c_retriever.search, query_text=query_text),
+                "vector": executor.submit(self.vector_retriever.search, query_text=query_text, **retriever_config),
+            }
+            results, errors = {}, {}
+            for name, future in futures.items():
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    errors[name] = e
+        return results, errors
+
+    def search(self, query_text, retriever_config=None):
+        """Busca nos dois retrievers em paralelo e gera uma única resposta.
+
+        'retriever_config' é repassado apenas ao retriever vetorial (ex: top_k).
+        Se um dos retrievers falhar (por exemplo, o LLM escreveu um Cypher
+        inválido), a resposta é gerada só com o contexto do outro; os erros
+        ficam em retriever_result.metadata["errors"]. Se os dois falharem,
+        o erro do Text2Cypher é levantado.
+        """
+        results, errors = self._retrieve(query_text, retriever_config or {})
+        if not results:
+            raise errors["text2cypher"] from errors["vector"]
+
+        items = [item for result in results.values() for item in result.items]
+        t2c_result = results.get("text2cypher")
+        retriever_result = RetrieverResult(
+            items=items,
+            metadata={
+                "cypher": t2c_result.metadata.get("cypher") if t2c_result else None,
+                "errors": {name: str(e) for name, e in errors.items()},
+            },
+        )
+        answer = generate_answer(self.llm, self.prompt_template, query_text, retriever_result)
+        return RagResultModel(answer=answer, retriever_result=retriever_result)
+
+
+def main():
+    from neo4j_graphrag.llm import OpenAILLM
+
+    # Os retrievers são os mesmos dos outros dois scripts (e usam o mesmo Driver).
+    import text2cypher_rag
+    import vector_cypher_rag
+
+    rag = CompositeRAG(
+        t2c_retriever=text2cypher_rag.build_retriever(),
+        vector_retriever=vector_cypher_rag.build_retriever(),
+        llm=OpenAILLM(model_name="gpt-4o"),
+    )
+
+    query_text = "What year was the movie Babe released, and what other movies are about talking animals?"
+
+    response = rag.search(query_text, retriever_config={"top_k": 5})
+
+    print(response.answer)
+    print("CYPHER :", response.retriever_result.metadata["cypher"])
+    for name, error in response.retriever_result.metadata["errors"].items():
+        print(f"ERRO ({name}):", error)
+    print_context(response) # Mostra o dado vindo direto do banco (só com DEBUG_CONTEXT=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+# =================================================================
+# CONFIGURAÇÃO (LIDA UMA ÚNICA VEZ)
+# =================================================================
+
+import os
+from dotenv import load_dotenv
+
+# load_dotenv(): Esta função lê o arquivo '.env' e carrega as chaves na memória
+# do processo atual. É uma prática de segurança: nunca escreva senhas no código.
+#
+# O Python executa um módulo só na primeira vez que ele é importado; nos
+# imports seguintes ele devolve o módulo já carregado. Por isso o '.env' é
+# lido do disco uma única vez por processo, não importa quantos scripts
+# façam 'import config' (ou quantas vezes um servidor recarregue os scripts).
+load_dotenv()
+
+NEO4J_URI = os.getenv("NEO4J_URI")
+NEO4J_USERNAME = os.getenv("NEO4J_USERNAME")
+NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# Ajustes do pool de conexões e do aquecimento do Neo4j (veja neo4j_driver.py).
+NEO4J_POOL = int(os.getenv("NEO4J_POOL", "50"))
+NEO4J_ACQ_TIMEOUT = float(os.getenv("NEO4J_ACQ_TIMEOUT", "60"))
+NEO4J_WARMUP = os.getenv("NEO4J_WARMUP") == "1"
+
+# Com DEBUG_CONTEXT=1 os scripts também mostram o contexto vindo do banco.
+DEBUG_CONTEXT = os.getenv("DEBUG_CONTEXT") == "1"
+
@@ -0,0 +1,27 @@
+# =================================================================
+# PRÉ-CÁLCULO DA NOTA MÉDIA DOS FILMES
+# =================================================================
+
+# Rode este script uma vez (e de novo sempre que novas avaliações forem
+# importadas). Ele calcula a média e a quantidade de avaliações de cada
+# filme e grava o resultado como propriedades do próprio nó Movie.
+# Com isso, a retrieval_query do 'vector_cypher_rag.py' apenas lê
+# 'node.userRating' em vez de percorrer todos os relacionamentos RATED.
+
+from neo4j_driver import get_driver
+
+driver = get_driver()
+
+# Grava userRating (média) e ratingCount (quantidade) em cada filme avaliado.
+summary = driver.execute_query("""
+MATCH (m:Movie)<-[r:RATED]-()
+WITH m, avg(r.rating) AS userRating, count(r) AS ratingCount
+SET m.userRating = userRating, m.ratingCount = ratingCount
+""").summary
+print("Propriedades gravadas:", summary.counters.properties_set)
+
+# Índice para ordenar e filtrar filmes pela nota sem ler todos os nós.
+driver.execute_query(
+    "CREATE INDEX movie_userRating IF NOT EXISTS FOR (m:Movie) ON (m.userRating)"
+)
+print("Índice movie_userRating criado.")
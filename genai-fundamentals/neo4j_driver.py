@@ -0,0 +1,64 @@
+# =================================================================
+# DRIVER COMPARTILHADO DO NEO4J
+# =================================================================
+
+import atexit
+
+from neo4j import GraphDatabase
+from neo4j.exceptions import ClientError
+
+import config
+
+# Criar um Driver custa caro: abre conexões TCP/TLS e aquece o "pool".
+# Por isso guardamos um único Driver por processo e todos os scripts o reutilizam.
+# O tamanho do pool pode ser ajustado no '.env' com NEO4J_POOL e NEO4J_ACQ_TIMEOUT.
+_driver = None
+
+# Logo depois que o Sandbox reinicia, o "page cache" do Neo4j está vazio e a
+# primeira busca precisa ler tudo do disco, ficando muito mais lenta que as
+# seguintes. Com NEO4J_WARMUP=1 no '.env', o Driver percorre uma vez os nós e
+# relacionamentos usados pelos scripts para trazê-los à memória.
+# Contar só nós ou relacionamentos (count(r)) é respondido pelas estatísticas
+# do banco, sem ler nenhum dado; por isso cada consulta lê propriedades e
+# percorre os mesmos caminhos que as buscas dos scripts usam.
+WARMUP_QUERIES = [
+    "MATCH (m:Movie) RETURN count(m.title), count(m.plot), count(m.userRating), count(m.plotEmbedding)",
+    "MATCH (p:Person)-[r:ACTED_IN]->(m:Movie) RETURN count(p.name), count(r.role), count(m.title)",
+    "MATCH (p:Person)-[:DIRECTED]->(m:Movie) RETURN count(p.name), count(m.title)",
+    "MATCH (m:Movie)-[:IN_GENRE]->(g:Genre) RETURN count(g.name), count(m.title)",
+    "MATCH (u:User)-[r:RATED]->(m:Movie) RETURN count(u.name), count(r.rating), count(m.title)",
+]
+
+
+def _warm_up(driver):
+    try:
+        # No APOC 4.x este procedimento aquece o banco inteiro; no APOC 5 ele
+        # não existe mais e caímos nas consultas acima.
+        driver.execute_query("CALL apoc.warmup.run(true, true, true)")
+    except ClientError:
+        for query in WARMUP_QUERIES:
+            driver.execute_query(query)
+
+
+def get_driver():
+    """Retorna o Driver do Neo4j, criando-o apenas na primeira chamada."""
+    global _driver
+    if _driver is None:
+        _driver = GraphDatabase.driver(
+            config.NEO4J_URI,
+            auth=(config.NEO4J_USERNAME, config.NEO4J_PASSWORD),
+            # Quantas conexões simultâneas o pool pode abrir. Com várias
+            # buscas em paralelo, um pool pequeno vira uma fila de espera.
+            max_connection_pool_size=config.NEO4J_POOL,
+            # Quanto tempo (segundos) esperar por uma conexão livre do pool.
+            connection_acquisition_timeout=config.NEO4J_ACQ_TIMEOUT,
+            connection_timeout=15,
+            keep_alive=True,
+        )
+        # O Driver é fechado automaticamente quando o processo termina,
+        # então os scripts não precisam mais chamar driver.close().
+        atexit.register(_driver.close)
+
+        if config.NEO4J_WARMUP:
+            _warm_up(_driver)
+    return _driver
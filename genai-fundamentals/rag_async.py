@@ -0,0 +1,102 @@
+# =================================================================
+# VÁRIAS PERGUNTAS EM PARALELO
+# =================================================================
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from neo4j_graphrag.generation.types import RagResultModel
+
+from rag_stream import generate_answer
+
+# Cada rag.search() passa a maior parte do tempo esperando a rede
+# (OpenAI para o embedding, Neo4j para a busca, OpenAI de novo para a resposta).
+# Em vez de esperar uma pergunta terminar para começar a próxima,
+# disparamos várias ao mesmo tempo.
+#
+# Os retrievers do 'neo4j-graphrag' só aceitam o Driver síncrono, então cada
+# busca roda em uma thread (asyncio.to_thread) usando o Driver compartilhado.
+# O Semaphore limita quantas buscas rodam juntas, para não estourar os
+# limites de requisição da OpenAI nem o pool de conexões do Neo4j.
+MAX_CONCURRENCY = 5
+
+
+async def _gather_limited(func, items, max_concurrency):
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(item):
+        async with semaphore:
+            return await asyncio.to_thread(func, item)
+
+    # return_exceptions=True: uma pergunta que falhar não derruba as outras.
+    return await asyncio.gather(*(run(item) for item in items), return_exceptions=True)
+
+
+def run_concurrently(func, items, max_concurrency=MAX_CONCURRENCY):
+    """Chama func(item) para cada item em paralelo e devolve os resultados em ordem."""
+    return asyncio.run(_gather_limited(func, items, max_concurrency))
+
+
+def search_all(rag, queries, max_concurrency=MAX_CONCURRENCY, **search_kwargs):
+    """Executa rag.search() para cada pergunta em paralelo.
+
+    Retorna uma lista na mesma ordem de 'queries'. Se uma busca falhar,
+    a posição correspondente contém a exceção em vez do resultado.
+    """
+    def search(query_text):
+        return rag.search(query_text=query_text, **search_kwargs)
+
+    return run_concurrently(search, queries, max_concurrency)
+
+
+def batch_search(retriever, queries, top_k=5, max_concurrency=MAX_CONCURRENCY):
+    """Busca várias perguntas com um único lote de embeddings.
+
+    Todas as perguntas viram vetores em uma só chamada à OpenAI
+    (embedder.embed_documents); depois cada vetor é buscado no Neo4j em
+    paralelo com retriever.search(query_vector=...). Retorna uma lista de
+    RetrieverResult na mesma ordem de 'queries'. Se uma busca falhar, a
+    posição correspondente contém a exceção em vez do resultado.
+    """
+    query_vectors = retriever.embedder.embed_documents(queries)
+
+    def search(query_vector):
+        return retriever.search(query_vector=query_vector, top_k=top_k)
+
+    return run_concurrently(search, query_vectors, max_concurrency)
+
+
+# =================================================================
+# UMA PERGUNTA, COM AS ETAPAS SOBREPOSTAS
+# =================================================================
+
+def _warm_llm_connection(llm):
+    # Uma chamada barata (não gera tokens) que abre a conexão HTTP com a
+    # OpenAI. Quando o prompt final ficar pronto, a conexão já está aberta.
+    try:
+        llm.client.models.retrieve(llm.model_name)
+    except Exception:
+        pass
+
+
+def search_pipelined(rag, query_text, retriever_config=None):
+    """Igual a rag.search(..., return_context=True) para retrievers vetoriais,
+    mas sem deixar o LLM parado enquanto a busca acontece.
+
+    O rag.search() roda tudo em sequência: embedding -> Neo4j -> LLM.
+    Aqui, enquanto a pergunta vira vetor e o Neo4j é consultado, a conexão
+    com o LLM já está sendo aberta em outra thread. A OpenAI não permite
+    injetar o contexto no meio de uma geração, então o LLM só é chamado de
+    fato quando o contexto chega, mas sem pagar o aperto de mão TCP/TLS.
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        warmup = executor.submit(_warm_llm_connection, rag.llm)
+        query_vector = executor.submit(rag.retriever.embedder.embed_query, query_text)
+
+        retriever_result = rag.retriever.search(
+            query_vector=query_vector.result(), **(retriever_config or {})
+        )
+        warmup.result()
+
+    answer = generate_answer(rag.llm, rag.prompt_template, query_text, retriever_result)
+    return RagResultModel(answer=answer, retriever_result=retriever_result)
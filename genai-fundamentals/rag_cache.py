@@ -0,0 +1,182 @@
+# =================================================================
+# CACHE EM DISCO DAS RESPOSTAS DO RAG
+# =================================================================
+
+import hashlib
+import os
+
+import neo4j
+from diskcache import Cache
+from neo4j.exceptions import ClientError
+from neo4j_graphrag.exceptions import SearchValidationError
+from neo4j_graphrag.generation.types import RagResultModel
+from neo4j_graphrag.retrievers import Text2CypherRetriever
+from neo4j_graphrag.types import RawSearchResult, RetrieverResult, Text2CypherSearchModel
+from pydantic import ValidationError
+
+from rag_async import run_concurrently
+from rag_stream import stream_search
+
+# Cada rag.search() paga embedding + busca no Neo4j + LLM, mesmo quando a
+# pergunta é exatamente a mesma da execução anterior. Guardamos a resposta
+# em disco (sobrevive entre execuções) e, se a pergunta se repetir, devolvemos
+# o resultado sem nenhuma chamada de rede.
+CACHE_DIR = os.path.expanduser("~/.cache/graphrag")
+CACHE_TTL = 24 * 60 * 60  # Uma resposta vale por 24 horas.
+CACHE_MAX_ITEMS = 10_000
+
+# O diskcache limita o tamanho em bytes, não em número de itens; estimamos
+# ~16 KB por resposta. Quando o limite é atingido, as respostas usadas há
+# mais tempo (least-recently-used) são descartadas primeiro.
+# O Cache cria a pasta no disco, então ele só é aberto no primeiro uso, e não
+# ao importar este módulo (como faz o get_driver() do 'neo4j_driver').
+_cache = None
+
+
+def _get_cache():
+    global _cache
+    if _cache is None:
+        _cache = Cache(
+            CACHE_DIR,
+            size_limit=CACHE_MAX_ITEMS * 16 * 1024,
+            eviction_policy="least-recently-used",
+        )
+    return _cache
+
+
+def _models(rag):
+    # Os modelos também definem a resposta: o LLM final, o LLM que escreve o
+    # Cypher (Text2Cypher) e o modelo/dimensões do embedder (Vector).
+    retriever_llm = getattr(rag.retriever, "llm", None)
+    embedder = getattr(rag.retriever, "embedder", None)
+    return [
+        rag.llm.model_name,
+        getattr(retriever_llm, "model_name", ""),
+        getattr(embedder, "model", ""),
+        str(getattr(embedder, "dimensions", "")),
+    ]
+
+
+def _cache_key(rag, query_text, retriever_config, context):
+    # 'context' é o que define como a resposta é montada (o schema do
+    # Text2Cypher ou a retrieval_query do Vector). Se ele ou algum dos
+    # modelos mudar, a chave muda junto e as respostas antigas deixam de ser usadas.
+    context_hash = hashlib.sha256("\n".join([context] + _models(rag)).encode()).hexdigest()
+    config = repr(sorted((retriever_config or {}).items()))
+    return hashlib.sha256((query_text + config + context_hash).encode()).hexdigest()
+
+
+def cached_search(rag, query_text, retriever_config=None, context="", on_delta=None):
+    """Igual a rag.search(..., return_context=True), mas consulta o cache antes.
+
+    Se 'on_delta' for informado, a resposta é entregue a ele em pedaços,
+    à medida que o LLM a escreve (ou de uma vez só, se vier do cache).
+    """
+    key = _cache_key(rag, query_text, retriever_config, context)
+
+    cached = _get_cache().get(key)
+    if cached is not None:
+        answer, items, cypher = cached
+        if on_delta:
+            on_delta(answer)
+    else:
+        if on_delta:
+            retriever_result, deltas = stream_search(rag, query_text, retriever_config)
+            parts = []
+            for delta in deltas:
+                on_delta(delta)
+                parts.append(delta)
+            answer = "".join(parts)
+        else:
+            response = rag.search(
+                query_text=query_text,
+                retriever_config=retriever_config,
+                return_context=True
+            )
+            answer = response.answer
+            retriever_result = response.retriever_result
+        items = retriever_result.items
+        cypher = retriever_result.metadata.get("cypher")
+        _get_cache().set(key, (answer, items, cypher), expire=CACHE_TTL)
+
+    metadata = {"cypher": cypher} if cypher else {}
+    return RagResultModel(
+        answer=answer,
+        retriever_result=RetrieverResult(items=items, metadata=metadata)
+    )
+
+
+def cache_warm(rag, queries, retriever_config=None, context=""):
+    """Pré-carrega o cache com as respostas de várias perguntas em paralelo."""
+    def search(query_text):
+        return cached_search(rag, query_text, retriever_config, context)
+
+    return run_concurrently(search, queries)
+
+
+# =================================================================
+# CACHE DO CYPHER GERADO PELO TEXT2CYPHER
+# =================================================================
+
+# Com temperature=0, a mesma pergunta (com o mesmo schema, exemplos e modelo)
+# sempre gera o mesmo Cypher. Guardamos o Cypher gerado e, quando a pergunta
+# se repete, executamos direto no Neo4j, sem chamar o LLM. Os dados do banco
+# continuam sendo lidos a cada busca; só a tradução texto -> Cypher é reaproveitada.
+CYPHER_CACHE_DIR = os.path.expanduser("~/.cache/t2c")
+
+_cypher_cache = None
+
+
+def _get_cypher_cache():
+    global _cypher_cache
+    if _cypher_cache is None:
+        _cypher_cache = Cache(CYPHER_CACHE_DIR)
+    return _cypher_cache
+
+
+class CachedText2CypherRetriever(Text2CypherRetriever):
+    """Text2CypherRetriever que só chama o LLM para perguntas novas."""
+
+    def _cypher_key(self, query_text):
+        # Schema, exemplos, prompt e modelo fazem parte da chave: se qualquer
+        # um deles mudar, o Cypher é gerado de novo.
+        prompt = "\n".join([
+            self.llm.model_name,
+            self.neo4j_schema,
+            "\n".join(self.examples or []),
+            self.custom_prompt or "",
+        ])
+        prompt_hash = hashlib.sha256(prompt.encode()).hexdigest()
+        return hashlib.sha256((prompt_hash + query_text).encode()).hexdigest()
+
+    def get_search_results(self, query_text, prompt_params=None):
+        # 'prompt_params' mudam o prompt de cada chamada, então não usamos o cache.
+        if prompt_params:
+            return super().get_search_results(query_text, prompt_params)
+
+        # Mesma validação do Text2CypherRetriever, também quando o Cypher vem do cache.
+        try:
+            query_text = Text2CypherSearchModel(query_text=query_text).query_text
+        except ValidationError as e:
+            raise SearchValidationError(e.errors()) from e
+
+        key = self._cypher_key(query_text)
+        cypher = _get_cypher_cache().get(key)
+        if cypher is not None:
+            try:
+                records, _, _ = self.driver.execute_query(
+                    query_=cypher,
+                    database_=self.neo4j_database,
+                    routing_=neo4j.RoutingControl.READ,
+                )
+                return RawSearchResult(records=records, metadata={"cypher": cypher})
+            except ClientError:
+                # O Cypher guardado não roda mais (ex: o grafo ou a versão do
+                # Neo4j mudou): ele sai do cache e pedimos um novo ao LLM.
+                _get_cypher_cache().delete(key)
+
+        # super() chama o LLM e transforma CypherSyntaxError em
+        # Text2CypherRetrievalError; só guardamos o Cypher que funcionou.
+        result = super().get_search_results(query_text)
+        _get_cypher_cache().set(key, result.metadata["cypher"])
+        return result
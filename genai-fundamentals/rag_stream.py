@@ -0,0 +1,78 @@
+# =================================================================
+# RESPOSTA EM STREAMING (PALAVRA POR PALAVRA)
+# =================================================================
+
+# O rag.search() só devolve a resposta quando o LLM termina de escrevê-la
+# inteira; em uma resposta longa isso são alguns segundos olhando para a tela
+# vazia. Com stream=True a OpenAI envia o texto em pedaços ("deltas") à
+# medida que ele é gerado, e podemos mostrá-los imediatamente.
+
+import json
+import sys
+
+from neo4j_graphrag.exceptions import LLMGenerationError
+
+import config
+
+
+def build_prompt(prompt_template, query_text, retriever_result):
+    """Monta o prompt final do RAG, como o GraphRAG.search() faz."""
+    context = "\n".join(item.content for item in retriever_result.items)
+    return prompt_template.format(query_text=query_text, context=context, examples="")
+
+
+def generate_answer(llm, prompt_template, query_text, retriever_result):
+    """Gera a resposta (sem streaming) para um resultado de retriever já pronto."""
+    prompt = build_prompt(prompt_template, query_text, retriever_result)
+    answer = llm.invoke(prompt, system_instruction=prompt_template.system_instructions)
+    return answer.content
+
+
+def stream_search(rag, query_text, retriever_config=None):
+    """Faz a busca e começa a gerar a resposta em streaming.
+
+    Retorna (retriever_result, deltas): o resultado do retriever, já
+    completo, e um iterador com os pedaços de texto da resposta.
+    """
+    retriever_result = rag.retriever.search(query_text=query_text, **(retriever_config or {}))
+
+    prompt = build_prompt(rag.prompt_template, query_text, retriever_result)
+
+    # O OpenAILLM do 'neo4j-graphrag' não tem streaming, então usamos o
+    # cliente da OpenAI que ele mesmo guarda, com o mesmo modelo e parâmetros.
+    # Como no OpenAILLM.invoke(), erros da OpenAI viram LLMGenerationError.
+    llm = rag.llm
+    try:
+        stream = llm.client.chat.completions.create(
+            messages=llm.get_messages(prompt, system_instruction=rag.prompt_template.system_instructions),
+            model=llm.model_name,
+            stream=True,
+            **llm.model_params,
+        )
+    except llm.openai.OpenAIError as e:
+        raise LLMGenerationError(e)
+    return retriever_result, _deltas(llm, stream)
+
+
+def _deltas(llm, stream):
+    # A conexão pode cair no meio da resposta, então a leitura também é protegida.
+    try:
+        for chunk in stream:
+            if chunk.choices:
+                yield chunk.choices[0].delta.content or ""
+    except llm.openai.OpenAIError as e:
+        raise LLMGenerationError(e)
+
+
+# A resposta é escrita na tela em pedaços, à medida que o LLM a gera.
+def write_delta(delta):
+    sys.stdout.write(delta)
+    sys.stdout.flush()
+
+
+def print_context(result):
+    """Mostra o contexto (dados brutos vindos do Neo4j) de uma resposta do RAG."""
+    # O contexto bruto pode ter dezenas de KB de texto; formatá-lo só vale a
+    # pena quando alguém vai lê-lo, então ele só aparece com DEBUG_CONTEXT=1.
+    if config.DEBUG_CONTEXT:
+        print("CONTEXT:", json.dumps([item.content for item in result.retriever_result.items], indent=2))
@@ -0,0 +1,83 @@
+# =================================================================
+# RECRIAÇÃO DO ÍNDICE VETORIAL COM 512 DIMENSÕES
+# =================================================================
+
+# Rode este script uma vez antes de usar os scripts vetoriais com
+# EMBEDDING_DIMENSIONS = 512. Ele:
+# 1. Gera de novo o vetor da sinopse (plot) de cada filme, agora com 512
+#    números, e o grava numa propriedade temporária ('plotEmbeddingNew').
+#    Esta é a etapa demorada (chamadas à OpenAI); se ela falhar no meio, o
+#    índice e os vetores antigos continuam intactos e basta rodar o script
+#    de novo: os filmes que já têm o vetor novo são pulados.
+# 2. Só depois, sem nenhuma chamada externa, troca o índice 'moviePlots':
+#    remove o antigo, copia os vetores novos para 'plotEmbedding' e recria o
+#    índice com 512 dimensões e quantização ligada (o Neo4j guarda uma versão
+#    compacta de cada vetor para comparar mais rápido). A propriedade
+#    temporária só é apagada depois que o índice foi criado: se a criação
+#    falhar, rodar o script de novo não gera nenhum vetor outra vez.
+# Se o 'moviePlots' já tem 512 dimensões, a etapa 1 é pulada.
+
+from neo4j_driver import get_driver
+from cached_embeddings import CachedOpenAIEmbeddings, EMBEDDING_MODEL, EMBEDDING_DIMENSIONS
+
+# Quantos filmes são lidos, embedados e gravados de cada vez.
+BATCH_SIZE = 500
+
+driver = get_driver()
+embedder = CachedOpenAIEmbeddings(model=EMBEDDING_MODEL, dimensions=EMBEDDING_DIMENSIONS)
+
+# O índice já foi recriado com 512 dimensões numa execução anterior?
+indexes, _, _ = driver.execute_query("""
+SHOW VECTOR INDEXES YIELD name, options
+WHERE name = 'moviePlots'
+RETURN options.indexConfig['vector.dimensions'] AS dimensions
+""")
+reindexed = bool(indexes) and indexes[0]["dimensions"] == EMBEDDING_DIMENSIONS
+
+# ETAPA 1: vetores novos na propriedade temporária.
+if not reindexed:
+    movies, _, _ = driver.execute_query("""
+    MATCH (m:Movie) WHERE m.plot IS NOT NULL AND m.plotEmbeddingNew IS NULL
+    RETURN elementId(m) AS id, m.plot AS plot
+    """)
+
+    for start in range(0, len(movies), BATCH_SIZE):
+        batch = movies[start:start + BATCH_SIZE]
+        embeddings = embedder.embed_documents([movie["plot"] for movie in batch])
+        driver.execute_query("""
+        UNWIND $rows AS row
+        MATCH (m:Movie) WHERE elementId(m) = row.id
+        CALL db.create.setNodeVectorProperty(m, 'plotEmbeddingNew', row.embedding)
+        """, rows=[
+            {"id": movie["id"], "embedding": embedding}
+            for movie, embedding in zip(batch, embeddings)
+        ])
+        print(f"Filmes processados: {start + len(batch)}/{len(movies)}")
+
+    # ETAPA 2: troca do índice. O índice antigo (1536 dimensões) não aceita os
+    # vetores novos, então ele sai antes da cópia e volta logo depois.
+    driver.execute_query("DROP INDEX moviePlots IF EXISTS")
+
+    driver.execute_query("""
+    MATCH (m:Movie) WHERE m.plotEmbeddingNew IS NOT NULL
+    SET m.plotEmbedding = m.plotEmbeddingNew
+    """)
+
+    driver.execute_query(f"""
+    CREATE VECTOR INDEX moviePlots IF NOT EXISTS
+    FOR (m:Movie) ON m.plotEmbedding
+    OPTIONS {{indexConfig: {{
+        `vector.dimensions`: {EMBEDDING_DIMENSIONS},
+        `vector.similarity_function`: 'cosine',
+        `vector.quantization.enabled`: true
+    }}}}
+    """)
+    print("Índice moviePlots recriado com", EMBEDDING_DIMENSIONS, "dimensões.")
+else:
+    print("Índice moviePlots já tem", EMBEDDING_DIMENSIONS, "dimensões.")
+
+# Com o índice pronto, a propriedade temporária não é mais necessária.
+driver.execute_query("""
+MATCH (m:Movie) WHERE m.plotEmbeddingNew IS NOT NULL
+REMOVE m.plotEmbeddingNew
+""")
@@ -0,0 +1,29 @@
+# This will test how CachedOpenAIEmbeddings splits texts into batched
+# /v1/embeddings requests, without calling OpenAI.
+import unittest
+
+from cached_embeddings import (
+    _batches,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_INPUT_TOKENS,
+)
+
+class TestEmbeddingBatches(unittest.TestCase):
+
+    def test_plot_sized_texts_fit_in_one_request(self):
+        plots = ["A plot of about three hundred characters. " * 7] * 500
+        batches = list(_batches(plots))
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(batches[0], plots)
+
+    def test_batches_respect_the_input_count_limit(self):
+        texts = ["short"] * (EMBEDDING_BATCH_SIZE + 1)
+        batches = list(_batches(texts))
+        self.assertEqual([len(b) for b in batches], [EMBEDDING_BATCH_SIZE, 1])
+
+    def test_oversized_text_is_rejected(self):
+        with self.assertRaises(ValueError):
+            list(_batches(["x" * (EMBEDDING_INPUT_TOKENS * 4 + 4)]))
+
+if __name__ == '__main__':
+    unittest.main()
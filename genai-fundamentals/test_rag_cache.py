@@ -0,0 +1,125 @@
+# This will test that cached RAG answers are keyed on everything that
+# shapes the answer, and that cached Cypher is validated and regenerated
+# when it stops working, without calling OpenAI or Neo4j.
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from diskcache import Cache
+from neo4j import Record
+from neo4j.exceptions import CypherSyntaxError
+from neo4j_graphrag.exceptions import SearchValidationError, Text2CypherRetrievalError
+
+import rag_cache
+from rag_cache import _cache_key, CachedText2CypherRetriever
+
+def make_rag(llm="gpt-4o", embedder_model="text-embedding-3-small", dimensions=512):
+    embedder = SimpleNamespace(model=embedder_model, dimensions=dimensions)
+    return SimpleNamespace(
+        llm=SimpleNamespace(model_name=llm),
+        retriever=SimpleNamespace(embedder=embedder),
+    )
+
+class TestCacheKey(unittest.TestCase):
+
+    def key(self, rag):
+        return _cache_key(rag, "question", {"top_k": 5}, "retrieval query")
+
+    def test_same_setup_gives_same_key(self):
+        self.assertEqual(self.key(make_rag()), self.key(make_rag()))
+
+    def test_llm_model_changes_key(self):
+        self.assertNotEqual(self.key(make_rag()), self.key(make_rag(llm="gpt-4o-mini")))
+
+    def test_embedder_changes_key(self):
+        self.assertNotEqual(self.key(make_rag()), self.key(make_rag(dimensions=1536)))
+        self.assertNotEqual(self.key(make_rag()), self.key(make_rag(embedder_model="text-embedding-3-large")))
+
+    def test_retriever_without_embedder(self):
+        rag = SimpleNamespace(
+            llm=SimpleNamespace(model_name="gpt-4o"),
+            retriever=SimpleNamespace(llm=SimpleNamespace(model_name="gpt-4o-mini")),
+        )
+        self.assertIsInstance(self.key(rag), str)
+
+class TestLazyCaches(unittest.TestCase):
+
+    def test_import_does_not_create_cache_dirs(self):
+        with tempfile.TemporaryDirectory() as home:
+            subprocess.run(
+                [sys.executable, "-c", "import rag_cache"],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                env={**os.environ, "HOME": home},
+                check=True,
+            )
+            self.assertFalse(os.path.exists(os.path.join(home, ".cache")))
+
+class FakeDriver:
+
+    def __init__(self, broken=()):
+        self.broken = set(broken)
+        self.queries = []
+
+    def execute_query(self, query_, **kwargs):
+        self.queries.append(query_)
+        if query_ in self.broken:
+            raise CypherSyntaxError("Invalid input")
+        return [Record({"released": 1995})], None, None
+
+def make_retriever(driver, cypher="MATCH (m:Movie) RETURN m.released"):
+    # Text2CypherRetriever.__init__ consulta a versão do Neo4j; montamos o
+    # objeto sem ele, só com os atributos que get_search_results usa.
+    retriever = CachedText2CypherRetriever.__new__(CachedText2CypherRetriever)
+    retriever.driver = driver
+    retriever.llm = mock.Mock(model_name="gpt-4o-mini")
+    retriever.llm.invoke.return_value = SimpleNamespace(content=cypher)
+    retriever.neo4j_schema = "schema"
+    retriever.examples = []
+    retriever.custom_prompt = None
+    retriever.neo4j_database = None
+    return retriever
+
+class TestCachedText2Cypher(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        cache = Cache(tmp.name)
+        self.addCleanup(cache.close)
+        patcher = mock.patch.object(rag_cache, "_cypher_cache", cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = cache
+
+    def test_second_call_skips_llm(self):
+        retriever = make_retriever(FakeDriver())
+        retriever.get_search_results("question")
+        retriever.get_search_results("question")
+        self.assertEqual(retriever.llm.invoke.call_count, 1)
+
+    def test_invalid_query_is_rejected_before_cache_lookup(self):
+        retriever = make_retriever(FakeDriver())
+        with self.assertRaises(SearchValidationError):
+            retriever.get_search_results(None)
+        self.assertEqual(retriever.driver.queries, [])
+
+    def test_broken_cached_cypher_is_regenerated(self):
+        retriever = make_retriever(FakeDriver(broken=["BROKEN"]))
+        key = retriever._cypher_key("question")
+        self.cache.set(key, "BROKEN")
+        result = retriever.get_search_results("question")
+        self.assertEqual(result.metadata["cypher"], "MATCH (m:Movie) RETURN m.released")
+        self.assertEqual(self.cache.get(key), "MATCH (m:Movie) RETURN m.released")
+
+    def test_broken_generated_cypher_is_wrapped_and_not_cached(self):
+        retriever = make_retriever(FakeDriver(broken=["BROKEN"]), cypher="BROKEN")
+        with self.assertRaises(Text2CypherRetrievalError):
+            retriever.get_search_results("question")
+        self.assertIsNone(self.cache.get(retriever._cypher_key("question")))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+# This will test that the streamed answer builds the same prompt as
+# GraphRAG and reports OpenAI errors like OpenAILLM.invoke, without
+# calling OpenAI or Neo4j.
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import openai
+from neo4j_graphrag.exceptions import LLMGenerationError
+from neo4j_graphrag.generation.prompts import RagTemplate
+from neo4j_graphrag.types import RetrieverResult, RetrieverResultItem
+
+from rag_stream import build_prompt, stream_search
+
+def make_rag(create):
+    llm = mock.Mock(model_name="gpt-4o", model_params={}, openai=openai)
+    llm.client.chat.completions.create.side_effect = create
+    retriever = mock.Mock()
+    retriever.search.return_value = RetrieverResult(
+        items=[RetrieverResultItem(content="Babe (1995)")]
+    )
+    return SimpleNamespace(llm=llm, retriever=retriever, prompt_template=RagTemplate())
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+class TestStreamSearch(unittest.TestCase):
+
+    def test_prompt_contains_context_and_question(self):
+        result = RetrieverResult(items=[RetrieverResultItem(content="Babe (1995)")])
+        prompt = build_prompt(RagTemplate(), "When was Babe released?", result)
+        self.assertIn("Babe (1995)", prompt)
+        self.assertIn("When was Babe released?", prompt)
+
+    def test_deltas_are_streamed(self):
+        rag = make_rag(lambda **kwargs: iter([chunk("19"), chunk("95"), chunk(None)]))
+        _, deltas = stream_search(rag, "question")
+        self.assertEqual("".join(deltas), "1995")
+
+    def test_request_error_is_wrapped(self):
+        def create(**kwargs):
+            raise openai.OpenAIError("boom")
+        rag = make_rag(create)
+        with self.assertRaises(LLMGenerationError):
+            stream_search(rag, "question")
+
+    def test_error_while_streaming_is_wrapped(self):
+        def broken_stream():
+            yield chunk("19")
+            raise openai.OpenAIError("connection lost")
+        rag = make_rag(lambda **kwargs: broken_stream())
+        _, deltas = stream_search(rag, "question")
+        with self.assertRaises(LLMGenerationError):
+            list(deltas)
+
+if __name__ == '__main__':
+    unittest.main()
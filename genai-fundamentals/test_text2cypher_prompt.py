@@ -0,0 +1,32 @@
+# This will test that the pre-built Text2Cypher prompt can be formatted
+# the same way Text2CypherRetriever formats it, without calling the LLM.
+import unittest
+
+from neo4j_graphrag.generation.prompts import Text2CypherTemplate
+
+from text2cypher_rag import t2c_prompt, neo4j_schema, examples_prompt
+
+class TestText2CypherPrompt(unittest.TestCase):
+
+    def format_prompt(self, query_text):
+        return Text2CypherTemplate(template=t2c_prompt).format(
+            schema=neo4j_schema,
+            examples=examples_prompt,
+            query_text=query_text,
+        )
+
+    def test_prompt_formats(self):
+        prompt = self.format_prompt("What year was the movie Babe released?")
+        self.assertIn("What year was the movie Babe released?", prompt)
+
+    def test_prompt_keeps_literal_braces(self):
+        prompt = self.format_prompt("question")
+        self.assertIn("Person {name: STRING, born: INTEGER}", prompt)
+        self.assertIn("(m:Movie {title: 'Babe'})", prompt)
+
+    def test_question_is_the_last_variable_part(self):
+        prefix = self.format_prompt("first").split("first")[0]
+        self.assertEqual(prefix, self.format_prompt("second").split("second")[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,25 +1,10 @@
-import os
-from dotenv import load_dotenv
-load_dotenv()
-
-from neo4j import GraphDatabase
-from neo4j_graphrag.llm import OpenAILLM
-from neo4j_graphrag.generation import GraphRAG
-from neo4j_graphrag.retrievers import Text2CypherRetriever
-
-# Conexão física com o servidor Neo4j (Driver).
-driver = GraphDatabase.driver(
-    os.getenv("NEO4J_URI"), 
-    auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD"))
-)
-
-# Criamos um LLM específico para gerar código. 
-# Usamos 'temperature: 0' para que ele seja 100% lógico. 
-# Se a temperatura fosse alta, ele poderia "inventar" comandos que não existem.
-t2c_llm = OpenAILLM(
-    model_name="gpt-4o", 
-    model_params={"temperature": 0}
-)
+# O '.env' é lido pelo módulo 'config' (uma única vez por processo), que o
+# 'neo4j_driver' importa antes de qualquer Driver ou cliente da OpenAI ser criado.
+
+# As bibliotecas pesadas ('neo4j-graphrag', 'neo4j', 'openai') só são
+# importadas dentro das funções abaixo, quando realmente forem usadas.
+# Este script nem usa embeddings, então não faz sentido pagar o tempo de
+# importação de tudo o que a 'neo4j-graphrag' oferece logo ao iniciar.
 
 # =================================================================
 # CONCEITO: O SCHEMA (A DEFINIÇÃO DO MUNDO)
@@ -54,39 +39,135 @@ The relationships:
 # Ensinamos ao modelo o padrão de resposta esperado. 
 # Quando o usuário pergunta "Ratings", o modelo já viu aqui que deve 
 # usar o relacionamento ':RATED'.
+# Nos filtros de igualdade, os exemplos usam sempre o mesmo formato
+# ({title: ...}, {released: ...}). O Neo4j troca sozinho os valores literais
+# por parâmetros antes de guardar o plano de execução, então o que importa
+# para o cache de planos é o formato da query ser sempre o mesmo: perguntas
+# sobre filmes diferentes passam a reaproveitar o mesmo plano. Filtros de
+# intervalo ou de texto parcial continuam usando WHERE.
+# (Não usamos '$title' aqui porque o Retriever executa o Cypher gerado sem
+# passar parâmetros.)
 examples = [
-    "USER INPUT: 'Get user ratings for a movie?' QUERY: MATCH (u:User)-[r:RATED]->(m:Movie) WHERE m.title = 'Movie Title' RETURN r.rating"
+    "USER INPUT: 'Get user ratings for a movie?' QUERY: MATCH (u:User)-[r:RATED]->(m:Movie {title: 'Movie Title'}) RETURN r.rating",
+    "USER INPUT: 'Which movies were released in a year?' QUERY: MATCH (m:Movie {released: 1995}) RETURN m.title"
 ]
 
-# Construímos o Retriever especializado em tradução de texto para Cypher.
-# Ele recebe o driver para rodar a query e o t2c_llm para escrevê-la.
-retriever = Text2CypherRetriever(
-    driver=driver,
-    llm=t2c_llm,
-    neo4j_schema=neo4j_schema,
-    examples=examples,
-)
-
-# O Pipeline final. Note que usamos o mesmo objeto 'GraphRAG'.
-# A magia é que a interface é a mesma, mas o 'motor' (retriever) mudou.
-llm = OpenAILLM(model_name="gpt-4o")
-rag = GraphRAG(retriever=retriever, llm=llm)
-
-# Pergunta baseada em um fato exato que está no banco.
-query_text = "What year was the movie Babe released?"
-
-# Execução do Pipeline:
-# 1. LLM recebe a pergunta + Schema + Exemplos.
-# 2. LLM gera o Cypher: MATCH (m:Movie {title: 'Babe'}) RETURN m.released.
-# 3. O Driver executa esse Cypher no Neo4j.
-# 4. O resultado volta e o LLM final monta a frase de resposta.
-response = rag.search(
-    query_text=query_text,
-    return_context=True
-)
-
-print(response.answer)
-print("CYPHER :", response.retriever_result.metadata["cypher"]) # Mostra a query gerada pela IA
-print("CONTEXT:", response.retriever_result.items) # Mostra o dado vindo direto do banco
-
-driver.close()
\ No newline at end of file
+# =================================================================
+# CONCEITO: PROMPT PRÉ-MONTADO (PREFIXO ESTÁVEL)
+# =================================================================
+
+# O schema e os exemplos nunca mudam, então montamos o prompt uma única vez,
+# aqui, deixando apenas a pergunta como variável, no final. Tudo o que vem
+# antes de {query_text} é exatamente igual em todas as chamadas.
+# (O cache de prompts da OpenAI só vale para prompts a partir de 1024 tokens;
+# este tem uns 300, então ele não se aplica aqui. O ganho é não remontar o
+# schema e os exemplos a cada pergunta.)
+# As chaves do schema ({name: STRING}) são duplicadas para não serem
+# confundidas com variáveis do template.
+def _escape_braces(text):
+    return text.replace("{", "{{").replace("}", "}}")
+
+examples_prompt = "\n".join(examples)
+
+t2c_prompt = f"""
+Task: Generate a Cypher statement for querying a Neo4j graph database from a user input.
+
+Schema:
+{_escape_braces(neo4j_schema)}
+
+Examples:
+{_escape_braces(examples_prompt)}
+
+Do not use any properties or relationships not included in the schema.
+For exact-match (equality) filters, use inline property maps as in the examples, e.g. (m:Movie {{{{title: 'Babe'}}}}).
+For ranges, comparisons or partial matches (<, >, CONTAINS, STARTS WITH), use a WHERE clause.
+Do not include triple backticks ``` or any additional text except the generated Cypher statement in your response.
+
+Input:
+{{query_text}}
+
+Cypher query:
+"""
+
+def build_retriever():
+    """Monta o Text2CypherRetriever com o Driver compartilhado e o t2c_llm."""
+    from neo4j_graphrag.llm import OpenAILLM
+
+    from neo4j_driver import get_driver
+    from rag_cache import CachedText2CypherRetriever
+
+    # Conexão física com o servidor Neo4j (Driver), compartilhada entre os scripts.
+    driver = get_driver()
+
+    # Criamos um LLM específico para gerar código. 
+    # Usamos 'temperature: 0' para que ele seja 100% lógico. 
+    # Se a temperatura fosse alta, ele poderia "inventar" comandos que não existem.
+    # Escrever uma query curta a partir de um schema pequeno é uma tarefa simples,
+    # então usamos o 'gpt-4o-mini': bem mais rápido e barato que o 'gpt-4o'.
+    # 'max_tokens' e 'stop' encerram a geração assim que a query termina.
+    t2c_llm = OpenAILLM(
+        model_name="gpt-4o-mini", 
+        model_params={
+            "temperature": 0,
+            "max_tokens": 200,
+            "stop": ["\n\n"],
+        }
+    )
+
+    # Construímos o Retriever especializado em tradução de texto para Cypher.
+    # Ele recebe o driver para rodar a query e o t2c_llm para escrevê-la.
+    # A versão 'Cached' lembra o Cypher já gerado para cada pergunta e, na
+    # repetição, executa a query direto no banco sem chamar o t2c_llm.
+    return CachedText2CypherRetriever(
+        driver=driver,
+        llm=t2c_llm,
+        neo4j_schema=neo4j_schema,
+        examples=examples,
+        custom_prompt=t2c_prompt,
+    )
+
+
+def build_rag(retriever):
+    """Monta o pipeline GraphRAG em volta do retriever."""
+    from neo4j_graphrag.llm import OpenAILLM
+    from neo4j_graphrag.generation import GraphRAG
+
+    # O Pipeline final. Note que usamos o mesmo objeto 'GraphRAG'.
+    # A magia é que a interface é a mesma, mas o 'motor' (retriever) mudou.
+    llm = OpenAILLM(model_name="gpt-4o")
+    return GraphRAG(retriever=retriever, llm=llm)
+
+
+def main():
+    from rag_cache import cached_search
+    from rag_stream import print_context, write_delta
+
+    rag = build_rag(build_retriever())
+
+    # Pergunta baseada em um fato exato que está no banco.
+    query_text = "What year was the movie Babe released?"
+
+    # Execução do Pipeline:
+    # 1. LLM recebe a pergunta + Schema + Exemplos.
+    # 2. LLM gera o Cypher: MATCH (m:Movie {title: 'Babe'}) RETURN m.released.
+    # 3. O Driver executa esse Cypher no Neo4j.
+    # 4. O resultado volta e o LLM final monta a frase de resposta.
+    # Se a mesma pergunta já foi feita (com o mesmo schema e exemplos), a
+    # resposta vem do cache em disco e nenhum desses passos é executado.
+    response = cached_search(
+        rag,
+        query_text,
+        context=t2c_prompt,
+        on_delta=write_delta
+    )
+
+    print() # Termina a linha da resposta
+    print("CYPHER :", response.retriever_result.metadata["cypher"]) # Mostra a query gerada pela IA
+    print_context(response) # Mostra o dado vindo direto do banco (só com DEBUG_CONTEXT=1)
+
+
+# O bloco abaixo só roda quando o arquivo é executado diretamente
+# (python text2cypher_rag.py). Assim, outros scripts podem importar
+# build_retriever() daqui sem disparar a pergunta de exemplo.
+if __name__ == "__main__":
+    main()
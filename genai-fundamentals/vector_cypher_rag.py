@@ -2,114 +2,183 @@
 # FASE 1: CONFIGURAÇÃO DO AMBIENTE E INFRAESTRUTURA
 # =================================================================
 
-import os
-from dotenv import load_dotenv
+# O módulo 'config' lê o arquivo '.env' e carrega as chaves na memória do
+# processo atual. É uma prática de segurança: nunca escreva senhas no código.
+# A leitura acontece uma única vez por processo, quando o 'neo4j_driver'
+# importa 'config', antes de o Driver e o Embedder serem criados.
 
-# load_dotenv(): Esta função lê o arquivo '.env' e carrega as chaves na memória 
-# do processo atual. É uma prática de segurança: nunca escreva senhas no código.
-load_dotenv()
-
-# Importação do Driver oficial do Neo4j. 
-# O "Driver" é o software que gerencia o protocolo binário (Bolt) de comunicação.
-from neo4j import GraphDatabase
-
-# Importação de componentes da biblioteca 'neo4j-graphrag'.
-# Esta biblioteca foi instalada via pip e é uma camada de abstração (SDK) 
-# criada pela Neo4j para você não ter que escrever centenas de linhas de código manual.
-from neo4j_graphrag.embeddings.openai import OpenAIEmbeddings
-from neo4j_graphrag.llm import OpenAILLM
-from neo4j_graphrag.generation import GraphRAG
-from neo4j_graphrag.retrievers import VectorCypherRetriever
-
-# =================================================================
-# FASE 2: CONEXÃO COM O BANCO (O DRIVER)
-# =================================================================
-
-# Aqui instanciamos o objeto 'driver'. 
-# Pense nele como um "Cabo de Rede Virtual" que fica permanentemente 
-# conectado ao seu Sandbox. Ele gerencia o "pool" de conexões (se uma cair, ele usa outra).
-driver = GraphDatabase.driver(
-    os.getenv("NEO4J_URI"), # O endereço (ex: bolt://44.200.x.x:7687)
-    auth=(
-        os.getenv("NEO4J_USERNAME"), 
-        os.getenv("NEO4J_PASSWORD")  # A senha do Sandbox
-    )
-)
+# As bibliotecas pesadas ('neo4j-graphrag', 'neo4j', 'openai') só são
+# importadas dentro das funções abaixo, quando realmente forem usadas.
+# Importá-las aqui no topo custaria centenas de milissegundos mesmo para
+# quem só quer ler a 'retrieval_query' deste arquivo.
 
 # =================================================================
-# FASE 3: O EMBEDDER (TRADUTOR MATEMÁTICO)
+# FASE 2: A QUERY DE RECUPERAÇÃO (O MAPA DO GRAFO)
 # =================================================================
 
-# O LLM não entende texto, entende números. O 'OpenAIEmbeddings' é o serviço 
-# que envia o texto da sua pergunta para a OpenAI e recebe de volta uma lista 
-# de 1536 números decimais (Vetor). 
-# Este vetor representa o "significado semântico" da frase.
-embedder = OpenAIEmbeddings(model="text-embedding-3-small")
-
-# =================================================================
-# FASE 4: A QUERY DE RECUPERAÇÃO (O MAPA DO GRAFO)
-# =================================================================
-
-# Por que escrevemos Cypher aqui? 
-# O Vector Search só te entrega o nó "Filme". Se você quer saber os atores, 
-# o Vetor não sabe navegar. Esta query diz ao sistema: 
+# Por que escrevemos Cypher aqui?
+# O Vector Search só te entrega o nó "Filme". Se você quer saber os atores,
+# o Vetor não sabe navegar. Esta query diz ao sistema:
 # "Depois que você achar o filme pelo vetor, siga as setas (relações) para pegar o resto".
+# A média das notas (userRating) já foi calculada e gravada em cada Filme
+# pelo script 'materialize_ratings.py'. Assim não precisamos percorrer todas
+# as avaliações (RATED) de cada filme a cada busca.
+# Gêneros e atores usam "pattern comprehensions" ([padrão | valor]), que o
+# Neo4j resolve como uma simples expansão, sem abrir uma subconsulta por filme.
+# A ordenação e o LIMIT vêm antes do RETURN: assim gêneros e atores só são
+# buscados para os filmes que vão de fato para o LLM. O '$top_k' é o mesmo
+# valor passado em retriever_config, preenchido pelo próprio Retriever.
 retrieval_query = """
-MATCH (node) <-[r:RATED]-()                 // Acha os relacionamentos de avaliação
+WITH node, score
+WHERE node.userRating IS NOT NULL           // Só filmes que têm avaliações
+ORDER BY node.userRating DESC               // Garante que os melhores venham primeiro
+LIMIT $top_k                                // Só os top_k seguem para a navegação
 RETURN
     node.title AS title,                    // Extrai a propriedade título
     node.plot AS plot,                      // Extrai a sinopse
     score AS similarityScore,               // O quão parecido o filme é com a pergunta
-    collect { MATCH (node)-[:IN_GENRE]->(g) RETURN g.name } as genres, // Navega até Gêneros
-    collect { MATCH (node)<-[:ACTED_IN]->(a) RETURN a.name } as actors, // Navega até Atores
-    avg(r.rating) as userRating             // Calcula a média das notas no banco
-ORDER BY userRating DESC                    // Garante que os melhores venham primeiro
+    [(node)-[:IN_GENRE]->(g) | g.name] AS genres,   // Navega até Gêneros
+    [(node)<-[:ACTED_IN]-(a) | a.name] AS actors,   // Navega até Atores
+    node.userRating AS userRating           // Média das notas, pré-calculada
 """
 
-# =================================================================
-# FASE 5: CONSTRUÇÃO DO RETRIEVER (O BUSCADOR)
-# =================================================================
 
-# O Retriever é um objeto que "sabe onde procurar".
-# Ele combina: Conexão (driver) + Onde procurar (index) + Como expandir (query) + Tradutor (embedder).
-retriever = VectorCypherRetriever(
-    driver,
-    index_name="moviePlots", # Nome do índice criado no Neo4j (essencial!)
-    retrieval_query=retrieval_query,
-    embedder=embedder,
-)
+def build_retriever():
+    """Monta o VectorCypherRetriever (Driver + Embedder + retrieval_query)."""
 
-# =================================================================
-# FASE 6: O LLM E O PIPELINE RAG (A LINHA DE MONTAGEM)
-# =================================================================
+    # Importação de componentes da biblioteca 'neo4j-graphrag'.
+    # Esta biblioteca foi instalada via pip e é uma camada de abstração (SDK)
+    # criada pela Neo4j para você não ter que escrever centenas de linhas de código manual.
+    from neo4j_graphrag.retrievers import VectorCypherRetriever
 
-# Instanciamos o modelo gpt-4o. Ele será o encarregado de ler o resultado 
-# do banco e escrever a resposta.
-llm = OpenAILLM(model_name="gpt-4o")
+    # O Driver oficial do Neo4j (o software que gerencia o protocolo binário Bolt)
+    # é criado uma única vez no módulo 'neo4j_driver' e reutilizado por todos os scripts.
+    from neo4j_driver import get_driver
+    from cached_embeddings import CachedOpenAIEmbeddings, EMBEDDING_MODEL, EMBEDDING_DIMENSIONS
 
-# 'GraphRAG' é a classe que orquestra tudo. Ela é o "Cérebro do Pipeline".
-# Quando você cria este objeto, você está definindo o fluxo: 
-# Entrada -> Busca no Grafo -> Contexto -> LLM -> Resposta.
-rag = GraphRAG(retriever=retriever, llm=llm)
+    # =================================================================
+    # FASE 3: CONEXÃO COM O BANCO (O DRIVER)
+    # =================================================================
 
-# =================================================================
-# FASE 7: EXECUÇÃO E RESULTADO
-# =================================================================
+    # Aqui obtemos o objeto 'driver'.
+    # Pense nele como um "Cabo de Rede Virtual" que fica permanentemente
+    # conectado ao seu Sandbox. Ele gerencia o "pool" de conexões (se uma cair, ele usa outra).
+    driver = get_driver()
+
+    # A retrieval_query descarta filmes sem 'userRating'. Se o
+    # 'materialize_ratings.py' ainda não rodou, nenhum filme tem a nota e o
+    # LLM receberia um contexto vazio sem nenhum aviso; melhor parar aqui.
+    # (Graças ao índice movie_userRating, a verificação lê um único nó.)
+    records, _, _ = driver.execute_query(
+        "MATCH (m:Movie) WHERE m.userRating IS NOT NULL RETURN m.title LIMIT 1"
+    )
+    if not records:
+        raise RuntimeError(
+            "Nenhum filme tem 'userRating'. Rode 'python genai-fundamentals/materialize_ratings.py' antes."
+        )
+
+    # =================================================================
+    # FASE 4: O EMBEDDER (TRADUTOR MATEMÁTICO)
+    # =================================================================
+
+    # O LLM não entende texto, entende números. O 'OpenAIEmbeddings' é o serviço
+    # que envia o texto da sua pergunta para a OpenAI e recebe de volta uma lista
+    # de números decimais (Vetor): 512, o tamanho do nosso índice vetorial.
+    # Este vetor representa o "significado semântico" da frase.
+    # A versão 'Cached' guarda o vetor de cada pergunta: repetir a pergunta
+    # não gera uma nova chamada à OpenAI.
+    embedder = CachedOpenAIEmbeddings(model=EMBEDDING_MODEL, dimensions=EMBEDDING_DIMENSIONS)
+
+    # =================================================================
+    # FASE 5: CONSTRUÇÃO DO RETRIEVER (O BUSCADOR)
+    # =================================================================
+
+    # O Retriever é um objeto que "sabe onde procurar".
+    # Ele combina: Conexão (driver) + Onde procurar (index) + Como expandir (query) + Tradutor (embedder).
+    return VectorCypherRetriever(
+        driver,
+        index_name="moviePlots", # Nome do índice criado no Neo4j (essencial!)
+        retrieval_query=retrieval_query,
+        embedder=embedder,
+    )
+
+
+def build_rag(retriever):
+    """Monta o pipeline GraphRAG em volta do retriever."""
+    from neo4j_graphrag.llm import OpenAILLM
+    from neo4j_graphrag.generation import GraphRAG
 
-query_text = "Find the highest rated action movie about travelling to other planets"
+    # =================================================================
+    # FASE 6: O LLM E O PIPELINE RAG (A LINHA DE MONTAGEM)
+    # =================================================================
 
-# .search(): Este é o método principal. Ele dispara internamente:
-# 1. Transformação da query em vetor.
-# 2. Busca no Neo4j.
-# 3. Execução da retrieval_query.
-# 4. Envio do contexto para o LLM.
-response = rag.search(
-    query_text=query_text, 
-    retriever_config={"top_k": 5}, # Pede os 5 melhores resultados
-    return_context=True            # Pede para o sistema mostrar o que ele achou no banco
-)
+    # Instanciamos o modelo gpt-4o. Ele será o encarregado de ler o resultado
+    # do banco e escrever a resposta.
+    llm = OpenAILLM(model_name="gpt-4o")
 
-print(response.answer) # Resposta formatada para o usuário
-print("CONTEXT:", response.retriever_result.items) # Dados brutos retornados pelo Neo4j
+    # 'GraphRAG' é a classe que orquestra tudo. Ela é o "Cérebro do Pipeline".
+    # Quando você cria este objeto, você está definindo o fluxo:
+    # Entrada -> Busca no Grafo -> Contexto -> LLM -> Resposta.
+    return GraphRAG(retriever=retriever, llm=llm)
+
+
+def main():
+    from rag_cache import cached_search
+    from rag_stream import print_context, write_delta
+
+    rag = build_rag(build_retriever())
+
+    # =================================================================
+    # FASE 7: EXECUÇÃO E RESULTADO
+    # =================================================================
+
+    query_text = "Find the highest rated action movie about travelling to other planets"
+
+    # .search(): Este é o método principal. Ele dispara internamente:
+    # 1. Transformação da query em vetor.
+    # 2. Busca no Neo4j.
+    # 3. Execução da retrieval_query.
+    # 4. Envio do contexto para o LLM.
+    # 'cached_search' guarda a resposta em disco: se a mesma pergunta for feita
+    # de novo (com a mesma retrieval_query), ela volta sem nenhuma chamada de rede.
+    # O contexto (o que ele achou no banco) sempre vem junto da resposta.
+    response = cached_search(
+        rag,
+        query_text,
+        retriever_config={"top_k": 5}, # Pede os 5 melhores resultados
+        context=retrieval_query,
+        on_delta=write_delta           # Mostra a resposta enquanto ela é gerada
+    )
 
-driver.close() # Encerra o túnel de conexão com o servidor
\ No newline at end of file
+    print() # Termina a linha da resposta
+    print_context(response) # Mostra o dado vindo direto do banco (só com DEBUG_CONTEXT=1)
+
+
+# O bloco abaixo só roda quando o arquivo é executado diretamente
+# (python vector_cypher_rag.py). Assim, outros scripts podem importar
+# build_retriever() daqui sem disparar a pergunta de exemplo.
+if __name__ == "__main__":
+    main()
+
+# Para responder várias perguntas de uma vez, sem esperar uma terminar para
+# começar a próxima, use 'search_all' (rag_async.py):
+#
+#   from rag_async import search_all
+#   from vector_cypher_rag import build_rag, build_retriever
+#   rag = build_rag(build_retriever())
+#   responses = search_all(rag, [pergunta_1, pergunta_2], retriever_config={"top_k": 5}, return_context=True)
+#
+# Se você só precisa do contexto e não da resposta do LLM, 'batch_search'
+# transforma todas as perguntas em vetores com uma única chamada à OpenAI:
+#
+#   from rag_async import batch_search
+#   results = batch_search(build_retriever(), [pergunta_1, pergunta_2], top_k=5)
+#
+# Nas duas funções, uma pergunta que falhar aparece na lista como a exceção
+# levantada, no lugar do resultado.
+#
+# Para uma única pergunta, 'search_pipelined' abre a conexão com o LLM
+# enquanto a busca no Neo4j ainda está acontecendo:
+#
+#   from rag_async import search_pipelined
+#   response = search_pipelined(build_rag(build_retriever()), query_text, retriever_config={"top_k": 5})
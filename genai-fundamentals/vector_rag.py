@@ -3,11 +3,12 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from neo4j import GraphDatabase
-from neo4j_graphrag.embeddings.openai import OpenAIEmbeddings
 from neo4j_graphrag.retrievers import VectorRetriever
 from neo4j_graphrag.llm import OpenAILLM
 from neo4j_graphrag.generation import GraphRAG
 
+from cached_embeddings import CachedOpenAIEmbeddings, EMBEDDING_MODEL, EMBEDDING_DIMENSIONS
+
 # Connect to Neo4j database
 driver = GraphDatabase.driver(
     os.getenv("NEO4J_URI"), 
@@ -17,8 +18,8 @@ driver = GraphDatabase.driver(
     )
 )
 
-# Create embedder
-embedder = OpenAIEmbeddings(model="text-embedding-3-small")
+# Create embedder (512 dimensions, matching the moviePlots vector index)
+embedder = CachedOpenAIEmbeddings(model=EMBEDDING_MODEL, dimensions=EMBEDDING_DIMENSIONS)
 
 # Create retriever
 retriever = VectorRetriever(